@@ -6,6 +6,8 @@
 # This etree here allows the writing method to write to the file directly, without
 # having to create a string representation first.
 
+from xml.sax.saxutils import escape, quoteattr
+
 
 class Element:
     def __init__(self, name, **kwargs):
@@ -22,10 +24,12 @@ class Element:
         self.attrib[key] = value
 
     def write(self, f):
-        kw_list = [f'{key}="{value}"' for key, value in self.attrib.items()]
+        kw_list = [
+            f"{key}={quoteattr(str(value))}" for key, value in self.attrib.items()
+        ]
         f.write("<{}>\n".format(" ".join([self.name] + kw_list)))
         if self.text:
-            f.write(self.text)
+            f.write(escape(self.text))
             f.write("\n")
         if self.text_writer:
             self.text_writer(f)
@@ -54,7 +58,7 @@ class ElementTree:
         self.root = root
 
     def write(self, filename, xml_declaration=True):
-        with open(filename, "w") as f:
+        with open(filename, "w", encoding="utf-8") as f:
             if xml_declaration:
                 f.write('<?xml version="1.0"?>\n')
             self.root.write(f)
@@ -1,8 +1,16 @@
+import io
+import os
+
 import numpy as np
 
-from .._exceptions import ReadError
+from .._exceptions import ReadError, WriteError
 from .._mesh import CellBlock
 
+# Only read HDF5 datasets chunk by chunk if the chunks are at least this large. h5py's
+# automatic chunking, used for meshio's own output, stays above this for all but small
+# datasets.
+_HDF5_MIN_CHUNK_NBYTES = 2**14
+
 numpy_to_xdmf_dtype = {
     "int8": ("Int", "1"),
     "int16": ("Int", "2"),
@@ -127,36 +135,105 @@ def translate_mixed_cells(data):
         11: 6,  # triangle6
     }
 
-    # collect types and offsets
-    types = []
-    offsets = []
+    # Cells of the same type typically come in large contiguous runs. Find the length
+    # of each run in vectorized fashion and cut it out of `data` in one go.
+    cells = []
     r = 0
     while r < len(data):
-        xdmf_type = data[r]
-        types.append(xdmf_type)
-        offsets.append(r)
-        if xdmf_type == 2:  # line
-            if data[r + 1] != 2:  # polyline
-                raise ReadError("XDMF reader: Only supports 2-point lines for now")
-            r += 1
-        r += 1
-        r += xdmf_idx_to_num_nodes[xdmf_type]
-
-    types = np.array(types)
-    offsets = np.array(offsets)
-
-    b = np.concatenate([[0], np.where(types[:-1] != types[1:])[0] + 1, [len(types)]])
-    cells = []
-    for start, end in zip(b[:-1], b[1:]):
-        meshio_type = xdmf_idx_to_meshio_type[types[start]]
-        n = xdmf_idx_to_num_nodes[types[start]]
-        point_offsets = offsets[start:end] + (2 if types[start] == 2 else 1)
-        indices = np.array([np.arange(n) + o for o in point_offsets])
-        cells.append(CellBlock(meshio_type, data[indices]))
+        xdmf_type = int(data[r])
+        if (
+            xdmf_type not in xdmf_idx_to_num_nodes
+            or xdmf_type not in xdmf_idx_to_meshio_type
+        ):
+            raise ReadError(f"XDMF reader: Unknown cell type index {xdmf_type}")
+        num_nodes = xdmf_idx_to_num_nodes[xdmf_type]
+        # vertices and lines are poly-vertices and -lines with an explicit number of
+        # nodes
+        num_header_items = 2 if xdmf_type in [1, 2] else 1
+        stride = num_header_items + num_nodes
+        n = _get_run_length(data, r, stride)
+        if n == 0:
+            raise ReadError("XDMF reader: Incomplete cell in mixed topology")
+        block = data[r : r + n * stride].reshape(n, stride)
+        if xdmf_type == 1 and np.any(block[:, 1] != 1):
+            raise ReadError("XDMF reader: Only supports 1-point vertices for now")
+        if xdmf_type == 2 and np.any(block[:, 1] != 2):
+            raise ReadError("XDMF reader: Only supports 2-point lines for now")
+        cells.append(
+            CellBlock(
+                xdmf_idx_to_meshio_type[xdmf_type],
+                block[:, num_header_items:].copy(),
+            )
+        )
+        r += n * stride
 
     return cells
 
 
+def mixed_cells_to_data(cells):
+    # The inverse of translate_mixed_cells(). All cells are written into one
+    # preallocated array; each cell is preceded by its XDMF type index. Vertices and
+    # lines are poly-vertices and -lines; for those, one needs to specify the number
+    # of nodes, too.
+    num_header_items = [2 if c.type in {"vertex", "line"} else 1 for c in cells]
+    block_sizes = [
+        c.data.shape[0] * (h + c.data.shape[1]) for c, h in zip(cells, num_header_items)
+    ]
+    block_offsets = np.cumsum([0] + block_sizes)
+
+    data = np.empty(block_offsets[-1], dtype=np.result_type(*[c.data for c in cells]))
+    for cell_block, h, start, end in zip(
+        cells, num_header_items, block_offsets[:-1], block_offsets[1:]
+    ):
+        num_nodes = cell_block.data.shape[1]
+        block = data[start:end].reshape(-1, h + num_nodes)
+        block[:, 0] = meshio_type_to_xdmf_index[cell_block.type]
+        if h == 2:
+            block[:, 1] = num_nodes
+        block[:, h:] = cell_block.data
+    return data
+
+
+def _get_run_length(data, start, stride):
+    # Number of consecutive complete cells in `data`, beginning at `start`, that are
+    # of the same type as the first one. Look at windows of geometrically growing
+    # size such that short runs are cheap, too.
+    xdmf_type = data[start]
+    max_n = (len(data) - start) // stride
+    n = 0
+    window = 16
+    while n < max_n:
+        m = min(window, max_n - n)
+        is_same = (
+            data[start + n * stride : start + (n + m) * stride : stride] == xdmf_type
+        )
+        if not is_same.all():
+            return n + int(is_same.argmin())
+        n += m
+        window *= 2
+    return n
+
+
+def check_float_dtype(float_dtype):
+    if float_dtype is None:
+        return
+    try:
+        name = np.dtype(float_dtype).name
+    except TypeError:
+        name = None
+    if name not in ["float32", "float64"]:
+        raise WriteError(
+            f"Unsupported float_dtype '{float_dtype}' (use 'float32' or 'float64'.)"
+        )
+
+
+def cast_float_data(data, float_dtype):
+    # Optionally cast floating-point data, e.g., to float32 for visualization
+    if float_dtype is None or data.dtype.kind != "f":
+        return data
+    return data.astype(float_dtype, copy=False)
+
+
 def attribute_type(data):
     # <https://xdmf.org/index.php/XDMF_Model_and_Format#Attribute>
     if len(data.shape) == 1 or (len(data.shape) == 2 and data.shape[1] == 1):
@@ -173,3 +250,133 @@ def attribute_type(data):
     if len(data.shape) != 3:
         raise ReadError()
     return "Matrix"
+
+
+def numpy_to_xml_text(data, fmt):
+    return "".join(iter_xml_text(data, fmt))
+
+
+def iter_xml_text(data, fmt, rows_per_chunk=10000):
+    # Format `data` like numpy.savetxt does, i.e., one row per line. Instead of
+    # formatting row by row in Python, format entire blocks of rows with one
+    # %-operation; this is several times faster. Only ever flatten one block at a
+    # time so that `data` isn't copied as a whole if it isn't contiguous.
+    num_cols = int(np.prod(data.shape[1:]))
+    row_fmt = " ".join(num_cols * [fmt]) + "\n"
+    for k in range(0, len(data), rows_per_chunk):
+        chunk = data[k : k + rows_per_chunk]
+        yield (len(chunk) * row_fmt) % tuple(chunk.ravel().tolist())
+
+
+def xml_text_to_numpy(text, dtype):
+    # Parse whitespace-separated numbers with numpy's C parser. Don't use
+    # text.strip() for checking if there's any data; it copies the entire string.
+    if not text or text.isspace():
+        # https://github.com/numpy/numpy/issues/18435
+        return np.empty((0,), dtype=dtype)
+    return np.fromstring(text, dtype=dtype, sep=" ")
+
+
+def binary_file_to_numpy(filename, dtype, endian="Native"):
+    # <https://xdmf.org/index.php/XDMF_Model_and_Format#DataItem>
+    byteorder = {"Native": "=", "Little": "<", "Big": ">"}
+    if endian not in byteorder:
+        raise ReadError(f"Unknown XDMF Endian '{endian}'.")
+    dtype = np.dtype(dtype)
+    data = np.fromfile(filename, dtype=dtype.newbyteorder(byteorder[endian]))
+    # convert to native byte order; this doesn't copy if it already is
+    return data.astype(dtype, copy=False)
+
+
+def numpy_to_binary_file(data, filename):
+    # XDMF binary data defaults to native byte order
+    with open(filename, "wb") as f:
+        data.astype(data.dtype.newbyteorder("="), copy=False).tofile(f)
+
+
+def read_hdf5_dataset(dset):
+    # `[()]` gives a np.ndarray. For datasets with large chunks, it's faster to read
+    # chunk by chunk into a preallocated array, though; this avoids h5py's generic
+    # selection machinery on data that doesn't align with the chunks. With tiny
+    # chunks (a few KB), the per-chunk overhead dominates, so read everything at once.
+    if dset.chunks is None or dset.size == 0:
+        return dset[()]
+
+    chunk_nbytes = int(np.prod(dset.chunks)) * dset.dtype.itemsize
+    if chunk_nbytes < _HDF5_MIN_CHUNK_NBYTES:
+        return dset[()]
+
+    out = np.empty(dset.shape, dtype=dset.dtype)
+    for s in dset.iter_chunks():
+        out[s] = dset[s]
+    return out
+
+
+def hdf5_dataset_kwargs(compression, compression_opts):
+    # h5py only accepts compression options for some filters (e.g., not for lzf), so
+    # the default compression level is only applied to gzip.
+    if compression is None:
+        compression_opts = None
+    elif compression == "gzip" and compression_opts is None:
+        compression_opts = 4
+    return {
+        "compression": compression,
+        "compression_opts": compression_opts,
+        # Byte-shuffling makes mesh data considerably more compressible.
+        "shuffle": compression is not None,
+    }
+
+
+def _xml_source(filename):
+    # Path-likes are passed on as strings, file objects as they are
+    if isinstance(filename, os.PathLike):
+        return os.fspath(filename)
+    return filename
+
+
+def _get_etree(source):
+    # Use lxml's C parser if available; it is considerably faster than xml.etree on
+    # large XDMF files. lxml can't read from text streams, though.
+    if not isinstance(source, io.TextIOBase):
+        try:
+            from lxml import etree
+        except ImportError:
+            pass
+        else:
+            return etree, True
+
+    from xml.etree import ElementTree
+
+    return ElementTree, False
+
+
+# Skip comments and processing instructions like xml.etree does, and allow for large
+# text nodes (inline XML data). Never resolve entities; older lxml versions read
+# external entities from disk by default.
+_lxml_options = {
+    "remove_comments": True,
+    "remove_pis": True,
+    "resolve_entities": False,
+    "huge_tree": True,
+}
+
+
+def parse_xml(filename):
+    source = _xml_source(filename)
+    etree, is_lxml = _get_etree(source)
+    parser = etree.XMLParser(**_lxml_options) if is_lxml else etree.XMLParser()
+    try:
+        return etree.parse(source, parser).getroot()
+    except etree.ParseError as e:
+        raise ReadError(f"XDMF reader: {e}") from e
+
+
+def iterparse_xml(filename, events):
+    # Like parse_xml(), but return an iterator over (event, element) pairs
+    source = _xml_source(filename)
+    etree, is_lxml = _get_etree(source)
+    kwargs = _lxml_options if is_lxml else {}
+    try:
+        yield from etree.iterparse(source, events, **kwargs)
+    except etree.ParseError as e:
+        raise ReadError(f"XDMF reader: {e}") from e
@@ -4,24 +4,33 @@ https://xdmf.org/index.php/XDMF_Model_and_Format
 """
 import os
 import pathlib
-from io import BytesIO
-from xml.etree import ElementTree as ET
+from xml.etree import ElementTree
 
 import numpy as np
 
-from .._common import cell_data_from_raw, raw_from_cell_data, write_xml
+from .._common import cell_data_from_raw, raw_from_cell_data
+from .._cxml import etree as ET
 from .._exceptions import ReadError, WriteError
 from .._helpers import register_format
 from .._mesh import CellBlock, Mesh
 from .common import (
     attribute_type,
+    binary_file_to_numpy,
+    cast_float_data,
+    check_float_dtype,
     dtype_to_format_string,
+    hdf5_dataset_kwargs,
+    iter_xml_text,
+    iterparse_xml,
     meshio_to_xdmf_type,
-    meshio_type_to_xdmf_index,
+    mixed_cells_to_data,
+    numpy_to_binary_file,
     numpy_to_xdmf_dtype,
+    read_hdf5_dataset,
     translate_mixed_cells,
     xdmf_to_meshio_type,
     xdmf_to_numpy_type,
+    xml_text_to_numpy,
 )
 
 
@@ -32,28 +41,75 @@ def read(filename):
 class XdmfReader:
     def __init__(self, filename):
         self.filename = filename
+        self.hdf5_files = {}
 
     def read(self):
-        parser = ET.XMLParser()
-        tree = ET.parse(self.filename, parser)
-        root = tree.getroot()
+        # Stream the file instead of building the full tree; this keeps the memory
+        # footprint bounded if the file contains large inline data.
+        context = iterparse_xml(self.filename, events=("start", "end"))
+        _, root = next(context)
 
         if root.tag != "Xdmf":
             raise ReadError()
 
         version = root.attrib["Version"]
 
-        if version.split(".")[0] == "2":
-            return self.read_xdmf2(root)
+        try:
+            if version.split(".")[0] == "2":
+                return self.read_xdmf2(context)
+
+            if version.split(".")[0] != "3":
+                raise ReadError(f"Unknown XDMF version {version}.")
+
+            return self.read_xdmf3(context)
+        finally:
+            self.close()
+
+    def close(self):
+        # Those files are opened in _read_data_item()
+        for f in self.hdf5_files.values():
+            f.close()
+        self.hdf5_files = {}
+
+    def _read_grid(self, context):
+        # Only one <Domain> with one <Grid> is supported. Returns the grid element
+        # (with its attributes, but without its children) and an iterator over its
+        # children.
+        event, domain = next(context)
+        if event != "start" or domain.tag != "Domain":
+            raise ReadError()
 
-        if version.split(".")[0] != "3":
-            raise ReadError(f"Unknown XDMF version {version}.")
+        event, grid = next(context)
+        if event != "start":
+            raise ReadError("XDMF reader: Only supports one grid right now.")
+        if grid.tag != "Grid":
+            raise ReadError()
 
-        return self.read_xdmf3(root)
+        return grid, self._iter_grid_children(context)
+
+    @staticmethod
+    def _iter_grid_children(context):
+        depth = 0
+        for event, elem in context:
+            if event == "start":
+                depth += 1
+                continue
+            if depth == 0:
+                # end of </Grid>
+                break
+            depth -= 1
+            if depth == 0:
+                yield elem
+                # The child has been processed; free it (and its data).
+                elem.clear()
+
+        for event, elem in context:
+            if event == "start":
+                if elem.tag == "Grid":
+                    raise ReadError("XDMF reader: Only supports one grid right now.")
+                raise ReadError()
 
     def _read_data_item(self, data_item, root=None):
-        import h5py
-
         if "Reference" in data_item.attrib:
             reference = data_item.attrib["Reference"]
             xpath = (data_item.text if reference == "XML" else reference).strip()
@@ -83,16 +139,13 @@ class XdmfReader:
 
         if fmt == "XML":
             dtype = xdmf_to_numpy_type[(data_type, precision)]
-            if data_item.text.strip() == "":
-                # https://github.com/numpy/numpy/issues/18435
-                data = np.empty((0,), dtype=dtype)
-            else:
-                data = np.fromstring(data_item.text, dtype=dtype, sep=" ")
-            return data.reshape(dims)
+            return xml_text_to_numpy(data_item.text, dtype).reshape(dims)
 
         elif fmt == "Binary":
-            return np.fromfile(
-                data_item.text.strip(), dtype=xdmf_to_numpy_type[(data_type, precision)]
+            return binary_file_to_numpy(
+                data_item.text.strip(),
+                xdmf_to_numpy_type[(data_type, precision)],
+                data_item.get("Endian", "Native"),
             ).reshape(dims)
 
         if fmt != "HDF":
@@ -105,20 +158,21 @@ class XdmfReader:
         dirname = pathlib.Path(self.filename).resolve().parent
         full_hdf5_path = dirname / filename
 
-        f = h5py.File(full_hdf5_path, "r")
+        if full_hdf5_path in self.hdf5_files:
+            f = self.hdf5_files[full_hdf5_path]
+        else:
+            import h5py
 
-        # Some files don't contain the leading slash /.
-        if h5path[0] == "/":
-            h5path = h5path[1:]
+            f = h5py.File(full_hdf5_path, "r")
+            self.hdf5_files[full_hdf5_path] = f
 
-        for key in h5path.split("/"):
-            f = f[key]
-        # `[()]` gives a np.ndarray
-        return f[()]
+        # Some files don't contain the leading slash /; h5py resolves the path
+        # relative to the root group in that case.
+        return read_hdf5_dataset(f[h5path])
 
     def read_information(self, c_data):
         field_data = {}
-        root = ET.fromstring(c_data)
+        root = ElementTree.fromstring(c_data)
         for child in root:
             str_tag = child.attrib["key"]
             dim = int(child.attrib["dim"])
@@ -128,20 +182,8 @@ class XdmfReader:
             field_data[str_tag] = np.array([num_tag, dim])
         return field_data
 
-    def read_xdmf2(self, root):  # noqa: C901
-        domains = list(root)
-        if len(domains) != 1:
-            raise ReadError()
-        domain = domains[0]
-        if domain.tag != "Domain":
-            raise ReadError()
-
-        grids = list(domain)
-        if len(grids) != 1:
-            raise ReadError("XDMF reader: Only supports one grid right now.")
-        grid = grids[0]
-        if grid.tag != "Grid":
-            raise ReadError()
+    def read_xdmf2(self, context):  # noqa: C901
+        grid, grid_children = self._read_grid(context)
 
         if "GridType" in grid.attrib and grid.attrib["GridType"] != "Uniform":
             raise ReadError()
@@ -152,7 +194,7 @@ class XdmfReader:
         cell_data_raw = {}
         field_data = {}
 
-        for c in grid:
+        for c in grid_children:
             if c.tag == "Topology":
                 data_items = list(c)
                 if len(data_items) != 1:
@@ -229,20 +271,8 @@ class XdmfReader:
             field_data=field_data,
         )
 
-    def read_xdmf3(self, root):  # noqa: C901
-        domains = list(root)
-        if len(domains) != 1:
-            raise ReadError()
-        domain = domains[0]
-        if domain.tag != "Domain":
-            raise ReadError()
-
-        grids = list(domain)
-        if len(grids) != 1:
-            raise ReadError("XDMF reader: Only supports one grid right now.")
-        grid = grids[0]
-        if grid.tag != "Grid":
-            raise ReadError()
+    def read_xdmf3(self, context):  # noqa: C901
+        grid, grid_children = self._read_grid(context)
 
         points = None
         cells = []
@@ -250,7 +280,7 @@ class XdmfReader:
         cell_data_raw = {}
         field_data = {}
 
-        for c in grid:
+        for c in grid_children:
             if c.tag == "Topology":
                 data_items = list(c)
                 if len(data_items) != 1:
@@ -333,7 +363,13 @@ class XdmfReader:
 
 class XdmfWriter:
     def __init__(
-        self, filename, mesh, data_format="HDF", compression="gzip", compression_opts=4
+        self,
+        filename,
+        mesh,
+        data_format="HDF",
+        compression="gzip",
+        compression_opts=None,
+        float_dtype=None,
     ):
         import h5py
 
@@ -342,12 +378,15 @@ class XdmfWriter:
                 "Unknown XDMF data format "
                 f"'{data_format}' (use 'XML', 'Binary', or 'HDF'.)"
             )
+        check_float_dtype(float_dtype)
 
         self.filename = pathlib.Path(filename)
         self.data_format = data_format
         self.data_counter = 0
         self.compression = compression
-        self.compression_opts = None if compression is None else compression_opts
+        self.compression_opts = compression_opts
+        # dtype for floating-point point and cell data; None keeps the input dtype
+        self.float_dtype = float_dtype
 
         if data_format == "HDF":
             self.h5_filename = self.filename.with_suffix(".h5")
@@ -367,34 +406,41 @@ class XdmfWriter:
         self.write_point_data(mesh.point_data, grid)
         self.write_cell_data(mesh.cell_data, grid)
 
-        ET.register_namespace("xi", "https://www.w3.org/2001/XInclude/")
+        # meshio's own etree writes the XML data directly to the file instead of
+        # assembling it all in memory first
+        ET.ElementTree(xdmf_file).write(filename)
 
-        write_xml(filename, xdmf_file)
+        if data_format == "HDF":
+            # Make sure all data is flushed to disk before the XDMF file is read.
+            self.h5_file.close()
 
-    def numpy_to_xml_string(self, data):
+    def write_data_item(self, data_item, data):
         if self.data_format == "XML":
-            s = BytesIO()
             fmt = dtype_to_format_string[data.dtype.name]
-            np.savetxt(s, data, fmt)
-            return "\n" + s.getvalue().decode()
-        elif self.data_format == "Binary":
+
+            def text_writer(f):
+                for text in iter_xml_text(data, fmt):
+                    f.write(text)
+
+            data_item.text_writer = text_writer
+        else:
+            data_item.text = self.write_heavy_data(data)
+
+    def write_heavy_data(self, data):
+        # Write data to a .bin or HDF5 file and return the reference to it
+        if self.data_format == "Binary":
             base = os.path.splitext(self.filename)[0]
             bin_filename = f"{base}{self.data_counter}.bin"
             self.data_counter += 1
-            # write binary data to file
-            with open(bin_filename, "wb") as f:
-                data.tofile(f)
+            numpy_to_binary_file(data, bin_filename)
             return bin_filename
 
-        if self.data_format != "HDF":
-            raise WriteError(f'Unknown data format "{self.data_format}"')
         name = f"data{self.data_counter}"
         self.data_counter += 1
         self.h5_file.create_dataset(
             name,
             data=data,
-            compression=self.compression,
-            compression_opts=self.compression_opts,
+            **hdf5_dataset_kwargs(self.compression, self.compression_opts),
         )
         return os.path.basename(self.h5_filename) + ":/" + name
 
@@ -415,7 +461,7 @@ class XdmfWriter:
             Format=self.data_format,
             Precision=prec,
         )
-        data_item.text = self.numpy_to_xml_string(points)
+        self.write_data_item(data_item, points)
 
     def write_cells(self, cells, grid):
         if len(cells) == 0:
@@ -441,7 +487,7 @@ class XdmfWriter:
                 Format=self.data_format,
                 Precision=prec,
             )
-            data_item.text = self.numpy_to_xml_string(cells[0].data)
+            self.write_data_item(data_item, cells[0].data)
 
         else:
             assert len(cells) > 1
@@ -452,28 +498,8 @@ class XdmfWriter:
                 TopologyType="Mixed",
                 NumberOfElements=str(total_num_cells),
             )
-            total_num_cell_items = sum(np.prod(c.data.shape) for c in cells)
-            num_vertices_and_lines = sum(
-                c.data.shape[0] for c in cells if c.type in {"vertex", "line"}
-            )
-            dim = str(total_num_cell_items + total_num_cells + num_vertices_and_lines)
-            cd = np.concatenate(
-                [
-                    np.hstack(
-                        [
-                            np.full(
-                                (
-                                    cell_block.data.shape[0],
-                                    2 if cell_block.type in {"vertex", "line"} else 1,
-                                ),
-                                meshio_type_to_xdmf_index[cell_block.type],
-                            ),
-                            cell_block.data,
-                        ]
-                    ).flatten()
-                    for cell_block in cells
-                ]
-            )
+            cd = mixed_cells_to_data(cells)
+            dim = str(len(cd))
             dt, prec = numpy_to_xdmf_dtype[cd.dtype.name]
             data_item = ET.SubElement(
                 topo,
@@ -483,10 +509,11 @@ class XdmfWriter:
                 Format=self.data_format,
                 Precision=prec,
             )
-            data_item.text = self.numpy_to_xml_string(cd)
+            self.write_data_item(data_item, cd)
 
     def write_point_data(self, point_data, grid):
         for name, data in point_data.items():
+            data = cast_float_data(data, self.float_dtype)
             att = ET.SubElement(
                 grid,
                 "Attribute",
@@ -504,11 +531,12 @@ class XdmfWriter:
                 Format=self.data_format,
                 Precision=prec,
             )
-            data_item.text = self.numpy_to_xml_string(data)
+            self.write_data_item(data_item, data)
 
     def write_cell_data(self, cell_data, grid):
         raw = raw_from_cell_data(cell_data)
         for name, data in raw.items():
+            data = cast_float_data(data, self.float_dtype)
             att = ET.SubElement(
                 grid,
                 "Attribute",
@@ -526,7 +554,7 @@ class XdmfWriter:
                 Format=self.data_format,
                 Precision=prec,
             )
-            data_item.text = self.numpy_to_xml_string(data)
+            self.write_data_item(data_item, data)
 
     # The original idea was to implement field data as XML CDATA. Unfortunately, in
     # Python's XML, CDATA handled poorly. There are workarounds, e.g.,
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import os
 import pathlib
-from io import BytesIO
 from xml.etree import ElementTree as ET
 
 import numpy as np
@@ -13,13 +12,22 @@ from .._exceptions import ReadError, WriteError
 from .._mesh import CellBlock
 from .common import (
     attribute_type,
+    binary_file_to_numpy,
+    cast_float_data,
+    check_float_dtype,
     dtype_to_format_string,
+    hdf5_dataset_kwargs,
     meshio_to_xdmf_type,
-    meshio_type_to_xdmf_index,
+    mixed_cells_to_data,
+    numpy_to_binary_file,
     numpy_to_xdmf_dtype,
+    numpy_to_xml_text,
+    parse_xml,
+    read_hdf5_dataset,
     translate_mixed_cells,
     xdmf_to_meshio_type,
     xdmf_to_numpy_type,
+    xml_text_to_numpy,
 )
 
 
@@ -27,9 +35,7 @@ class TimeSeriesReader:
     def __init__(self, filename):  # noqa: C901
         self.filename = pathlib.Path(filename)
 
-        parser = ET.XMLParser()
-        tree = ET.parse(self.filename, parser)
-        root = tree.getroot()
+        root = parse_xml(self.filename)
 
         if root.tag != "Xdmf":
             raise ReadError()
@@ -193,14 +199,14 @@ class TimeSeriesReader:
         data_format = data_item.attrib["Format"]
 
         if data_format == "XML":
-            return np.fromstring(
-                data_item.text,
-                dtype=xdmf_to_numpy_type[(data_type, precision)],
-                sep=" ",
+            return xml_text_to_numpy(
+                data_item.text, xdmf_to_numpy_type[(data_type, precision)]
             ).reshape(dims)
         elif data_format == "Binary":
-            return np.fromfile(
-                data_item.text.strip(), dtype=xdmf_to_numpy_type[(data_type, precision)]
+            return binary_file_to_numpy(
+                data_item.text.strip(),
+                xdmf_to_numpy_type[(data_type, precision)],
+                data_item.get("Endian", "Native"),
             ).reshape(dims)
 
         if data_format != "HDF":
@@ -224,23 +230,32 @@ class TimeSeriesReader:
         if h5path[0] != "/":
             raise ReadError()
 
-        for key in h5path[1:].split("/"):
-            f = f[key]
-        # `[()]` gives a np.ndarray
-        return f[()]
+        return read_hdf5_dataset(f[h5path])
 
 
 class TimeSeriesWriter:
-    def __init__(self, filename, data_format: str = "HDF") -> None:
+    def __init__(
+        self,
+        filename,
+        data_format: str = "HDF",
+        compression: str | None = "gzip",
+        compression_opts: int | None = None,
+        float_dtype: str | None = None,
+    ) -> None:
         if data_format not in ["XML", "Binary", "HDF"]:
             raise WriteError(
                 "Unknown XDMF data format "
                 f"'{data_format}' (use 'XML', 'Binary', or 'HDF'.)"
             )
+        check_float_dtype(float_dtype)
 
         self.filename = pathlib.Path(filename)
         self.data_format = data_format
         self.data_counter = 0
+        self.compression = compression
+        self.compression_opts = compression_opts
+        # dtype for floating-point point and cell data; None keeps the input dtype
+        self.float_dtype = float_dtype
 
         self.xdmf_file = ET.Element("Xdmf", Version="3.0")
 
@@ -319,23 +334,23 @@ class TimeSeriesWriter:
 
     def numpy_to_xml_string(self, data):
         if self.data_format == "XML":
-            s = BytesIO()
             fmt = dtype_to_format_string[data.dtype.name]
-            np.savetxt(s, data.flatten(), fmt)
-            return s.getvalue().decode()
+            return numpy_to_xml_text(data, fmt)
         elif self.data_format == "Binary":
             bin_filename = f"{self.filename.stem}{self.data_counter}.bin"
             self.data_counter += 1
-            # write binary data to file
-            with open(bin_filename, "wb") as f:
-                data.tofile(f)
+            numpy_to_binary_file(data, bin_filename)
             return bin_filename
 
         if self.data_format != "HDF":
             raise WriteError()
         name = f"data{self.data_counter}"
         self.data_counter += 1
-        self.h5_file.create_dataset(name, data=data)
+        self.h5_file.create_dataset(
+            name,
+            data=data,
+            **hdf5_dataset_kwargs(self.compression, self.compression_opts),
+        )
         return os.path.basename(self.h5_filename) + ":/" + name
 
     def points(self, grid, points):
@@ -404,24 +419,8 @@ class TimeSeriesWriter:
                 TopologyType="Mixed",
                 NumberOfElements=str(total_num_cells),
             )
-            total_num_cell_items = sum(np.prod(c.data.shape) for c in cell_blocks)
-            dim = total_num_cell_items + total_num_cells
-            # Lines translate to Polylines, and one needs to specify the exact
-            # number of nodes. Hence, prepend 2.
-            for c in cell_blocks:
-                if c.type == "line":
-                    c.data = np.insert(c.data, 0, 2, axis=1)
-                    dim += len(c.data)
-            dim = str(dim)
-            cd = np.concatenate(
-                [
-                    # prepend column with xdmf type index
-                    np.insert(
-                        c.data, 0, meshio_type_to_xdmf_index[c.type], axis=1
-                    ).flatten()
-                    for c in cell_blocks
-                ]
-            )
+            cd = mixed_cells_to_data(cell_blocks)
+            dim = str(len(cd))
             dt, prec = numpy_to_xdmf_dtype[cd.dtype.name]
             data_item = ET.SubElement(
                 topo,
@@ -435,6 +434,7 @@ class TimeSeriesWriter:
 
     def point_data(self, point_data: dict[str, np.ndarray], grid: ET.Element):
         for name, data in point_data.items():
+            data = cast_float_data(data, self.float_dtype)
             att = ET.SubElement(
                 grid,
                 "Attribute",
@@ -459,6 +459,7 @@ class TimeSeriesWriter:
     ) -> None:
         raw = raw_from_cell_data(cell_data)
         for name, data in raw.items():
+            data = cast_float_data(data, self.float_dtype)
             att = ET.SubElement(
                 grid,
                 "Attribute",
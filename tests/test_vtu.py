@@ -55,6 +55,20 @@ def test(mesh, data_type, tmp_path):
     helpers.write_read(tmp_path, writer, meshio.vtu.read, mesh, tol)
 
 
+@pytest.mark.parametrize("binary", [False, True])
+def test_special_characters_in_names(binary, tmp_path):
+    name = 'a<b & "c"\nd'
+    mesh = meshio.Mesh(
+        helpers.tri_mesh.points,
+        helpers.tri_mesh.cells,
+        point_data={name: np.arange(len(helpers.tri_mesh.points), dtype=float)},
+    )
+    filename = tmp_path / "test.vtu"
+    meshio.vtu.write(filename, mesh, binary=binary)
+    mesh = meshio.vtu.read(filename)
+    assert list(mesh.point_data) == [name]
+
+
 def test_generic_io(tmp_path):
     helpers.generic_io(tmp_path / "test.vtu")
     # With additional, insignificant suffix:
@@ -10,6 +10,9 @@ test_set_full = [
     helpers.line_mesh,
     helpers.tri_mesh,
     helpers.line_tri_mesh,
+    meshio.Mesh(
+        helpers.tri_mesh.points, [("vertex", [[0], [3]])] + helpers.tri_mesh.cells
+    ),
     helpers.tri_mesh_2d,
     helpers.triangle6_mesh,
     helpers.quad_mesh,
@@ -54,12 +57,207 @@ def test_xdmf3(mesh, kwargs0, tmp_path):
     helpers.write_read(tmp_path, write, meshio.xdmf.read, mesh, 1.0e-14)
 
 
+def test_binary_byte_order(tmp_path):
+    # non-native byte order is converted on write
+    mesh = helpers.add_point_data(helpers.tri_mesh, 1, dtype=">f8")
+
+    def write(*args, **kwargs):
+        return meshio.xdmf.write(*args, data_format="Binary", **kwargs)
+
+    helpers.write_read(tmp_path, write, meshio.xdmf.read, mesh, 1.0e-14)
+
+
+@pytest.mark.parametrize("data_format", ["XML", "Binary", "HDF"])
+def test_float_dtype(data_format, tmp_path):
+    mesh = helpers.add_cell_data(
+        helpers.add_point_data(helpers.tri_mesh, 1), [("a", (), np.float64)]
+    )
+
+    def write(*args, **kwargs):
+        return meshio.xdmf.write(
+            *args, data_format=data_format, float_dtype="float32", **kwargs
+        )
+
+    helpers.write_read(tmp_path, write, meshio.xdmf.read, mesh, 1.0e-4)
+
+    mesh = meshio.xdmf.read(tmp_path / "test.dat")
+    assert mesh.points.dtype == np.float64
+    assert mesh.point_data["a"].dtype == np.float32
+    assert mesh.cell_data["a"][0].dtype == np.float32
+
+
+@pytest.mark.parametrize("data_format", ["XML", "HDF"])
+def test_non_ascii_names(data_format, tmp_path):
+    mesh = meshio.Mesh(
+        helpers.tri_mesh.points,
+        helpers.tri_mesh.cells,
+        point_data={"Temperatur in °C": np.arange(len(helpers.tri_mesh.points))},
+    )
+    filename = tmp_path / "test.xdmf"
+    meshio.xdmf.write(filename, mesh, data_format=data_format)
+
+    assert "Temperatur in °C" in filename.read_text(encoding="utf-8")
+    mesh = meshio.xdmf.read(filename)
+    assert list(mesh.point_data) == ["Temperatur in °C"]
+
+
+@pytest.mark.parametrize("data_format", ["XML", "HDF"])
+def test_special_characters_in_names(data_format, tmp_path):
+    name = 'a<b & "c"\nd'
+    mesh = meshio.Mesh(
+        helpers.tri_mesh.points,
+        helpers.tri_mesh.cells,
+        point_data={name: np.arange(len(helpers.tri_mesh.points), dtype=float)},
+    )
+    filename = tmp_path / "test.xdmf"
+    meshio.xdmf.write(filename, mesh, data_format=data_format)
+    mesh = meshio.xdmf.read(filename)
+    assert list(mesh.point_data) == [name]
+
+
+def test_mixed_vertex_encoding():
+    # poly-vertices carry their number of nodes, like poly-lines
+    cells = [
+        meshio.CellBlock("vertex", np.array([[0], [3]])),
+        meshio.CellBlock("triangle", np.array([[0, 1, 2]])),
+    ]
+    data = meshio.xdmf.common.mixed_cells_to_data(cells)
+    assert np.array_equal(data, [1, 1, 0, 1, 1, 3, 4, 0, 1, 2])
+
+    cells_in = meshio.xdmf.common.translate_mixed_cells(data)
+    assert [c.type for c in cells_in] == ["vertex", "triangle"]
+    assert np.array_equal(cells_in[0].data, [[0], [3]])
+
+
+@pytest.mark.parametrize("data_format", ["XML", "Binary", "HDF"])
+def test_time_series_float_dtype(data_format, tmp_path, monkeypatch):
+    # binary data files end up in the current directory
+    monkeypatch.chdir(tmp_path)
+    filename = tmp_path / "out.xdmf"
+    mesh = helpers.tri_mesh_2d
+    u = np.full(mesh.points.shape, 0.1)
+
+    with meshio.xdmf.TimeSeriesWriter(
+        filename, data_format=data_format, float_dtype="float32"
+    ) as writer:
+        writer.write_points_cells(mesh.points, mesh.cells)
+        writer.write_data(0.0, point_data={"u": u})
+
+    with meshio.xdmf.TimeSeriesReader(filename) as reader:
+        points, _ = reader.read_points_cells()
+        _, pd, _ = reader.read_data(0)
+    assert points.dtype == np.float64
+    assert pd["u"].dtype == np.float32
+    assert np.allclose(pd["u"], u, atol=1.0e-7)
+
+
+@pytest.mark.parametrize("float_dtype", ["foo", "int32"])
+def test_invalid_float_dtype(float_dtype, tmp_path):
+    with pytest.raises(meshio.WriteError):
+        meshio.xdmf.write(
+            tmp_path / "out.xdmf", helpers.tri_mesh, float_dtype=float_dtype
+        )
+    with pytest.raises(meshio.WriteError):
+        meshio.xdmf.TimeSeriesWriter(tmp_path / "out.xdmf", float_dtype=float_dtype)
+
+
+@pytest.mark.parametrize("data", [[3, 0, 1, 2], [11, 0, 1, 2, 3, 4, 5], [4, 0, 1]])
+def test_invalid_mixed_cells(data):
+    with pytest.raises(meshio.ReadError):
+        meshio.xdmf.common.translate_mixed_cells(np.array(data))
+
+
+@pytest.mark.parametrize(
+    "chunks,chunked_read",
+    [
+        ((100, 3), False),
+        # h5py's automatic chunking
+        (True, True),
+        ((50000, 3), True),
+        (None, False),
+    ],
+)
+def test_read_hdf5_dataset(chunks, chunked_read, tmp_path, monkeypatch):
+    h5py = pytest.importorskip("h5py")
+    iter_chunks = h5py.Dataset.iter_chunks
+    num_calls = []
+
+    def spy(self, *args, **kwargs):
+        num_calls.append(1)
+        return iter_chunks(self, *args, **kwargs)
+
+    monkeypatch.setattr(h5py.Dataset, "iter_chunks", spy)
+
+    data = np.random.rand(120000, 3)
+    with h5py.File(tmp_path / "test.h5", "w") as h5_file:
+        dset = h5_file.create_dataset("data", data=data, chunks=chunks)
+        assert np.array_equal(meshio.xdmf.common.read_hdf5_dataset(dset), data)
+    assert bool(num_calls) == chunked_read
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "lzf"])
+def test_time_series_compression(compression, tmp_path):
+    filename = tmp_path / "out.xdmf"
+    mesh = helpers.tri_mesh_2d
+    phi = np.arange(len(mesh.points), dtype=float)
+
+    with meshio.xdmf.TimeSeriesWriter(filename, compression=compression) as writer:
+        writer.write_points_cells(mesh.points, mesh.cells)
+        writer.write_data(0.0, point_data={"phi": phi})
+
+    with meshio.xdmf.TimeSeriesReader(filename) as reader:
+        points, _ = reader.read_points_cells()
+        _, pd, _ = reader.read_data(0)
+    assert np.allclose(points, mesh.points, atol=1.0e-14)
+    assert np.allclose(pd["phi"], phi, atol=1.0e-14)
+
+
 def test_generic_io(tmp_path):
     helpers.generic_io(tmp_path / "test.xdmf")
     # With additional, insignificant suffix:
     helpers.generic_io(tmp_path / "test.0.xdmf")
 
 
+@pytest.mark.parametrize("mode", ["r", "rb"])
+def test_read_file_object(mode, tmp_path):
+    filename = tmp_path / "test.xdmf"
+    meshio.xdmf.write(filename, helpers.tri_mesh, data_format="XML")
+
+    with open(filename, mode) as f:
+        mesh = meshio.read(f, file_format="xdmf")
+    assert np.allclose(mesh.points, helpers.tri_mesh.points, atol=1.0e-14)
+    assert np.array_equal(mesh.cells[0].data, helpers.tri_mesh.cells[0].data)
+
+
+def test_read_invalid_xml(tmp_path):
+    filename = tmp_path / "test.xdmf"
+    filename.write_text('<Xdmf Version="3.0"><Domain>')
+    with pytest.raises(meshio.ReadError):
+        meshio.xdmf.read(filename)
+    with pytest.raises(meshio.ReadError):
+        meshio.xdmf.TimeSeriesReader(filename)
+
+
+def test_no_external_entities(tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("secret")
+    filename = tmp_path / "test.xdmf"
+    filename.write_text(
+        f'<!DOCTYPE Xdmf [<!ENTITY x SYSTEM "{secret.as_uri()}">]>\n'
+        '<Xdmf Version="3.0">&x;</Xdmf>'
+    )
+    for parse in [
+        meshio.xdmf.common.parse_xml,
+        lambda f: next(meshio.xdmf.common.iterparse_xml(f, ("end",)))[1],
+    ]:
+        try:
+            root = parse(filename)
+        except meshio.ReadError:
+            # xml.etree doesn't know the entity
+            continue
+        assert "secret" not in "".join(root.itertext())
+
+
 def test_time_series():
     # write the data
     filename = "out.xdmf"